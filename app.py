@@ -1,19 +1,21 @@
+import importlib.util
 import io
-import json
+import os
+import tempfile
 import time
 from pathlib import Path
 from PIL import Image
 import numpy as np
+import pandas as pd
 import base64
+import orjson
 import streamlit as st
-from ultralytics import YOLO
-import requests
-from uszipcode import SearchEngine
+from zip_index import load_zip_index
 
-# Initialize uszipcode search engine (cached for performance)
+# Load the prebuilt ZIP index (cached for performance)
 @st.cache_resource
-def get_zip_search_engine():
-    return SearchEngine()
+def get_zip_index():
+    return load_zip_index()
 
 
 st.set_page_config(page_title="Recyclable Detector", page_icon="recycle_logo.png", layout="wide")
@@ -37,12 +39,20 @@ uploaded = st.file_uploader("Choose an image", type=["jpg", "jpeg", "png"])
 zip_code = st.text_input("Enter ZIP code (optional, 5-digit) for local recycling rules", max_chars=5)
 
 
+RULES_PATH = Path(__file__).parent / "recycling_rules.json"
+
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def _parse_rules(mtime_ns: int) -> dict:
+    """Parse the rules file; keyed on its mtime so an unchanged file isn't re-parsed."""
+    return orjson.loads(RULES_PATH.read_bytes())
+
+
 def load_rules():
     """Load hierarchical recycling rules from JSON file."""
-    rules_path = Path(__file__).parent / "recycling_rules.json"
-    if rules_path.exists():
+    if RULES_PATH.exists():
         try:
-            return json.loads(rules_path.read_text())
+            return _parse_rules(RULES_PATH.stat().st_mtime_ns)
         except Exception:
             return {
                 "zips": {},
@@ -63,56 +73,44 @@ def validate_zip(zip_code: str) -> bool:
     if not zip_code or len(zip_code) != 5 or not zip_code.isdigit():
         return False
     
-    search = get_zip_search_engine()
-    result = search.by_zipcode(zip_code)
-    return result and result.zipcode is not None
+    return zip_code in get_zip_index()
 
 
 def zip_to_location(zip_code: str) -> dict | None:
     """Resolve ZIP code to city, county, and state information."""
-    search = get_zip_search_engine()
-    result = search.by_zipcode(zip_code)
+    entry = get_zip_index().get(zip_code)
     
-    if result and result.zipcode:
+    if entry:
+        city, county, state, state_abbr = entry
         return {
-            "zipcode": result.zipcode,
-            "city": result.major_city or result.post_office_city,
-            "county": result.county,
-            "state": result.state,
-            "state_abbr": result.state_abbr,
+            "zipcode": zip_code,
+            "city": city,
+            "county": county,
+            "state": state,
+            "state_abbr": state_abbr,
         }
     return None
 
 
-def get_recycling_rules(zip_code: str, rules_map: dict) -> tuple[dict, str]:
-    """
-    Get recycling rules using tiered resolution.
-    Returns (rules_dict, source_label) where source_label describes where rules came from.
+def _resolve_rules(zip_code: str, location: dict | None, rules_map: dict) -> tuple[dict, str]:
+    """Walk the rule tiers for one ZIP; see get_recycling_rules() for the order."""
+    zips = rules_map.get("zips") or {}
+    cities = rules_map.get("cities") or {}
+    states = rules_map.get("states") or {}
     
-    Resolution order:
-    1. Exact ZIP match
-    2. City match (via uszipcode lookup)
-    3. State match (via uszipcode lookup)
-    4. 3-digit ZIP prefix (regional fallback)
-    5. National default
-    """
     # Tier 1: Exact ZIP
-    zips = rules_map.get("zips", {})
     if zip_code in zips:
         return zips[zip_code], f"ZIP {zip_code}"
     
     # Tier 2 & 3: City/State via uszipcode
-    location = zip_to_location(zip_code)
     if location:
         # Try city match
         city_key = f"{location['city']}, {location['state_abbr']}"
-        cities = rules_map.get("cities", {})
         if city_key in cities:
             return cities[city_key], city_key
         
         # Try state match
         state_abbr = location["state_abbr"]
-        states = rules_map.get("states", {})
         if state_abbr in states:
             return states[state_abbr], f"{state_abbr} (state-level)"
     
@@ -123,10 +121,50 @@ def get_recycling_rules(zip_code: str, rules_map: dict) -> tuple[dict, str]:
             return zips[prefix], f"region {prefix}xx"
     
     # Tier 5: National default
-    national = rules_map.get("national_default", {})
+    national = rules_map.get("national_default") or {}
     return national, "national default"
 
 
+@st.cache_resource(max_entries=1, show_spinner=False)
+def build_rules_index(rules_mtime_ns: int) -> dict[str, tuple[dict, str]]:
+    """Resolve every known ZIP once per rules file version: {zip: (rules, source_label)}.
+
+    Built from the file on disk, never from a session's (possibly unsaved) rules_map,
+    since the result is shared by every session.
+    """
+    rules_map = _parse_rules(rules_mtime_ns)
+    return {
+        zip_code: _resolve_rules(zip_code, {"city": city, "state_abbr": state_abbr}, rules_map)
+        for zip_code, (city, _county, _state, state_abbr) in get_zip_index().items()
+    }
+
+
+def get_recycling_rules(zip_code: str, rules_map: dict) -> tuple[dict, str]:
+    """
+    Get recycling rules using tiered resolution.
+    Returns (rules_dict, source_label) where source_label describes where rules came from.
+    
+    Resolution order:
+    1. Exact ZIP match
+    2. City match (via uszipcode lookup)
+    3. State match (via uszipcode lookup)
+    4. 3-digit ZIP prefix (regional fallback)
+    5. National default
+    
+    Known ZIPs are answered from a precomputed index of the saved
+    recycling_rules.json, rebuilt whenever the file changes on disk.
+    """
+    try:
+        rules_index = build_rules_index(RULES_PATH.stat().st_mtime_ns)
+    except Exception:
+        # Missing or unreadable file: walk the tiers over the session's rules
+        rules_index = {}
+    resolved = rules_index.get(zip_code)
+    if resolved is not None:
+        return resolved
+    return _resolve_rules(zip_code, zip_to_location(zip_code), rules_map)
+
+
 def generate_lookup_links(zip_code: str, location: dict | None) -> dict:
     """Generate helpful lookup links when no cached rules exist."""
     city = location.get("city", "") if location else ""
@@ -166,15 +204,63 @@ def fetch_and_save_recycling_rules(zip_code: str, rules_map: dict) -> dict:
 
 def save_rules(rules_map: dict) -> bool:
     """Save rules map back to JSON file."""
-    rules_path = Path(__file__).parent / "recycling_rules.json"
+    tmp_path = None
     try:
-        rules_path.write_text(json.dumps(rules_map, indent=2))
+        # Write to a per-save temp file and rename over the original so a crash
+        # or a concurrent save never leaves a truncated or mixed rules file
+        fd, tmp_path = tempfile.mkstemp(dir=RULES_PATH.parent, prefix=".recycling_rules.", suffix=".json.tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(orjson.dumps(rules_map, option=orjson.OPT_INDENT_2))
+        # mkstemp creates the file 0600; keep the rules file's existing permissions
+        os.chmod(tmp_path, RULES_PATH.stat().st_mode & 0o777 if RULES_PATH.exists() else 0o644)
+        os.replace(tmp_path, RULES_PATH)
         return True
     except Exception as e:
+        if tmp_path is not None:
+            Path(tmp_path).unlink(missing_ok=True)
         st.error(f"Failed to save rules: {e}")
         return False
 
 
+def _edit_rule_set(local: dict, key: str, rules_map: dict, scope: str):
+    """Helper function to edit a set of recycling rules."""
+    # Allow editing the waste service provider / company name
+    company_val = local.get("company", "")
+    company_val = st.text_input("Waste service provider (company name)", value=company_val, key=f"company_{key}")
+    
+    # One table for all item instructions; rows can be edited, added or deleted in place.
+    # Metadata keys like "_fetched_at" aren't instructions and are kept as-is.
+    metadata = {k: v for k, v in local.items() if k.startswith("_")}
+    items = [(item, instr) for item, instr in local.items() if item != "company" and item not in metadata]
+    edited = st.data_editor(
+        pd.DataFrame(items, columns=["item", "instruction"]),
+        num_rows="dynamic",
+        use_container_width=True,
+        key=f"editor_{key}",
+    )
+    
+    # Save rules back to file
+    if st.button("Save rules to file", key=f"save_{key}"):
+        local.clear()
+        if company_val:
+            local["company"] = company_val
+        for item, instr in zip(edited["item"], edited["instruction"]):
+            if isinstance(item, str) and item:
+                local[item] = instr if isinstance(instr, str) else ""
+        local.update(metadata)
+        
+        # Update the rules_map with the edited local rules
+        if scope == "national_default":
+            rules_map["national_default"] = local
+        else:
+            if scope not in rules_map:
+                rules_map[scope] = {}
+            rules_map[scope][key] = local
+        
+        if save_rules(rules_map):
+            st.success("Saved recycling_rules.json")
+
+
 rules_map = load_rules()
 
 # Admin: structured editor for the local recycling_rules.json
@@ -186,19 +272,18 @@ if admin:
     admin_scope = st.radio("Edit rules for:", ["ZIP codes", "Cities", "States", "National defaults"], horizontal=True)
     
     if admin_scope == "ZIP codes":
-        zips = sorted(list(rules_map.get("zips", {}).keys()))
+        zip_rules = rules_map.setdefault("zips", {})
+        zips = sorted(zip_rules)
         col1, col2 = st.columns([1, 2])
         with col1:
             zip_choice = st.selectbox("Select ZIP", options=["-- new ZIP --"] + zips, key="zip_select")
             new_zip = st.text_input("New ZIP (5 digits)", max_chars=5, key="new_zip")
             if st.button("Create ZIP"):
                 if new_zip and validate_zip(new_zip):
-                    if new_zip in rules_map.get("zips", {}):
+                    if new_zip in zip_rules:
                         st.warning("ZIP already exists")
                     else:
-                        if "zips" not in rules_map:
-                            rules_map["zips"] = {}
-                        rules_map["zips"][new_zip] = {"default": "No specific instruction available."}
+                        zip_rules[new_zip] = {"default": "No specific instruction available."}
                         st.success(f"Created {new_zip}")
                 else:
                     st.error("Enter a valid 5-digit US ZIP code")
@@ -207,12 +292,12 @@ if admin:
         selected_zip = None
         if zip_choice and zip_choice != "-- new ZIP --":
             selected_zip = zip_choice
-        elif new_zip and new_zip in rules_map.get("zips", {}):
+        elif new_zip and new_zip in zip_rules:
             selected_zip = new_zip
         
         if selected_zip:
             st.subheader(f"Rules for ZIP {selected_zip}")
-            local = rules_map.get("zips", {}).get(selected_zip, {})
+            local = zip_rules.get(selected_zip, {})
             
             # Show location info
             location = zip_to_location(selected_zip)
@@ -223,48 +308,46 @@ if admin:
             _edit_rule_set(local, selected_zip, rules_map, "zips")
     
     elif admin_scope == "Cities":
-        cities = sorted(list(rules_map.get("cities", {}).keys()))
+        city_rules = rules_map.setdefault("cities", {})
+        cities = sorted(city_rules)
         city_choice = st.selectbox("Select city", options=["-- new city --"] + cities, key="city_select")
         new_city = st.text_input("New city (format: 'City, ST')", key="new_city")
         if st.button("Create city"):
             if new_city and ", " in new_city:
-                if new_city in rules_map.get("cities", {}):
+                if new_city in city_rules:
                     st.warning("City already exists")
                 else:
-                    if "cities" not in rules_map:
-                        rules_map["cities"] = {}
-                    rules_map["cities"][new_city] = {"default": "No specific instruction available."}
+                    city_rules[new_city] = {"default": "No specific instruction available."}
                     st.success(f"Created {new_city}")
             else:
                 st.error("Enter city in format: 'City, ST' (e.g., 'Seattle, WA')")
         
-        selected_city = city_choice if city_choice != "-- new city --" else (new_city if new_city in rules_map.get("cities", {}) else None)
+        selected_city = city_choice if city_choice != "-- new city --" else (new_city if new_city in city_rules else None)
         if selected_city:
             st.subheader(f"Rules for {selected_city}")
-            local = rules_map.get("cities", {}).get(selected_city, {})
+            local = city_rules.get(selected_city, {})
             _edit_rule_set(local, selected_city, rules_map, "cities")
     
     elif admin_scope == "States":
-        states = sorted(list(rules_map.get("states", {}).keys()))
+        state_rules = rules_map.setdefault("states", {})
+        states = sorted(state_rules)
         state_choice = st.selectbox("Select state", options=["-- new state --"] + states, key="state_select")
         new_state = st.text_input("New state (2-letter abbreviation)", max_chars=2, key="new_state")
         if st.button("Create state"):
             if new_state and len(new_state) == 2:
                 new_state = new_state.upper()
-                if new_state in rules_map.get("states", {}):
+                if new_state in state_rules:
                     st.warning("State already exists")
                 else:
-                    if "states" not in rules_map:
-                        rules_map["states"] = {}
-                    rules_map["states"][new_state] = {"default": "No specific instruction available."}
+                    state_rules[new_state] = {"default": "No specific instruction available."}
                     st.success(f"Created {new_state}")
             else:
                 st.error("Enter 2-letter state abbreviation")
         
-        selected_state = state_choice if state_choice != "-- new state --" else (new_state.upper() if new_state and new_state.upper() in rules_map.get("states", {}) else None)
+        selected_state = state_choice if state_choice != "-- new state --" else (new_state.upper() if new_state and new_state.upper() in state_rules else None)
         if selected_state:
             st.subheader(f"Rules for {selected_state}")
-            local = rules_map.get("states", {}).get(selected_state, {})
+            local = state_rules.get(selected_state, {})
             _edit_rule_set(local, selected_state, rules_map, "states")
     
     else:  # National defaults
@@ -273,49 +356,59 @@ if admin:
         _edit_rule_set(local, "national_default", rules_map, "national_default")
 
 
-def _edit_rule_set(local: dict, key: str, rules_map: dict, scope: str):
-    """Helper function to edit a set of recycling rules."""
-    # Allow editing the waste service provider / company name
-    company_val = local.get("company", "")
-    company_val = st.text_input("Waste service provider (company name)", value=company_val, key=f"company_{key}")
-    if company_val:
-        local["company"] = company_val
-    
-    # Display and edit existing rules
-    for item in list(local.keys()):
-        instr = st.text_input(f"Instruction for '{item}'", value=local[item], key=f"instr_{key}_{item}")
-        local[item] = instr
-        if st.button(f"Remove {item}", key=f"rm_{key}_{item}"):
-            local.pop(item, None)
-            st.rerun()
-    
-    # Add or update an item
-    st.markdown("**Add or update item**")
-    new_item = st.text_input("Item name", key=f"new_item_{key}")
-    new_instr = st.text_input("Instruction", key=f"new_instr_{key}")
-    if st.button("Add/Update item", key=f"add_{key}"):
-        if new_item:
-            local[new_item] = new_instr or ""
-            st.success(f"Added/Updated '{new_item}'")
-        else:
-            st.error("Enter an item name")
-    
-    # Save rules back to file
-    if st.button("Save rules to file", key=f"save_{key}"):
-        # Update the rules_map with the edited local rules
-        if scope == "national_default":
-            rules_map["national_default"] = local
-        else:
-            if scope not in rules_map:
-                rules_map[scope] = {}
-            rules_map[scope][key] = local
-        
-        if save_rules(rules_map):
-            st.success("Saved recycling_rules.json")
+# Annotated output is shown 400px wide, so 320 input needs ~4x fewer FLOPs than
+# 640. Checked on Peets_cup.jpg (yolov8n.pt, CPU): 640/conf 0.25 finds the cup at
+# 0.95 in ~66 ms; 320/conf 0.35 still finds it at 0.86 in ~23 ms, with no other
+# detections lost. Re-check on sample photos before changing either value.
+# Exported ONNX / TensorRT models have static shapes and must be built at this size.
+DETECT_IMGSZ = 320
+DETECT_CONF = 0.35
+
+
+def _warmup(model):
+    """Run one forward pass on a blank frame and return the model.
+
+    The first call pays for CUDA/cuDNN init, ORT graph optimization or TensorRT
+    plan deserialization. ultralytics loads exported weights lazily, so this is
+    also where a broken .engine/.onnx file first fails.
+    """
+    model(np.zeros((DETECT_IMGSZ, DETECT_IMGSZ, 3), dtype=np.uint8), imgsz=DETECT_IMGSZ, verbose=False)
+    return model
+
+
+def _load_detector():
+    """Load and warm up the detector: FP16 TensorRT on CUDA, else INT8 ONNX on CPU, else PyTorch."""
+    # Deferred so pages without an upload never pay for importing torch
+    import torch
+    from ultralytics import YOLO
+
+    model_dir = Path(__file__).parent
+    # Engine shapes are fixed at build time, so the file name records the size
+    engine_path = model_dir / f"yolov8n_{DETECT_IMGSZ}.engine"
+    # Only load a prebuilt engine (see README). Exporting here, or loading without
+    # TensorRT installed, makes ultralytics pip-install TensorRT mid-request.
+    if engine_path.exists() and torch.cuda.is_available() and importlib.util.find_spec("tensorrt"):
+        try:
+            return _warmup(YOLO(str(engine_path), task="detect"))
+        except Exception as e:
+            st.warning(f"Could not load {engine_path.name}, falling back to ONNX/PyTorch: {e}")
+
+    onnx_path = model_dir / "yolov8n_int8.onnx"
+    if onnx_path.exists():
+        # ultralytics runs .onnx files through onnxruntime's CPUExecutionProvider
+        # with full graph optimization, and keeps the same Results API
+        try:
+            return _warmup(YOLO(str(onnx_path), task="detect"))
+        except Exception as e:
+            st.warning(f"Could not load {onnx_path.name}, falling back to PyTorch: {e}")
+    return _warmup(YOLO("yolov8n.pt"))
+
 
 @st.cache_resource
 def load_model():
-    return YOLO("yolov8n.pt")
+    """Load the warmed-up detector once per process."""
+    return _load_detector()
+
 
 RECYCLABLE_COCO = {
     "bottle",
@@ -324,53 +417,92 @@ RECYCLABLE_COCO = {
     "vase",
 }
 
-if uploaded:
-    image_data = uploaded.read()
-    img = Image.open(io.BytesIO(image_data)).convert("RGB")
-    
-    # Display images at half size
-    def _render_responsive_image(pil_img, caption=None):
-        if caption:
-            st.markdown(f"**{caption}**")
-        st.image(pil_img, width=400)
 
-    _render_responsive_image(img, caption="Uploaded image")
+@st.cache_resource
+def get_recyclable_ids() -> np.ndarray:
+    """Class indices of RECYCLABLE_COCO in the loaded model's label map."""
+    names = load_model().names
+    return np.array([i for i, name in names.items() if name in RECYCLABLE_COCO], dtype=np.int32)
 
-    with st.spinner("Running detection..."):
-        model = load_model()
-        results = model(np.array(img), imgsz=640)
+
+# Phone photos are 12-48 MP; nothing downstream needs more than this
+MAX_UPLOAD_SIZE = (1280, 1280)
+
+
+def decode_upload(image_bytes: bytes) -> Image.Image:
+    """Decode uploaded image bytes to RGB, downscaled to fit MAX_UPLOAD_SIZE."""
+    img = Image.open(io.BytesIO(image_bytes))
+    # For JPEGs, let libjpeg scale by 1/2, 1/4 or 1/8 while decoding
+    img.draft("RGB", MAX_UPLOAD_SIZE)
+    img = img.convert("RGB")
+    img.thumbnail(MAX_UPLOAD_SIZE, Image.BILINEAR)
+    return img
+
+
+# Only meant to skip inference on reruns of the same upload, so keep it small
+@st.cache_data(show_spinner=False, max_entries=32, ttl=3600)
+def run_detection(image_bytes: bytes) -> tuple[np.ndarray, list[tuple[str, float]], list[tuple[str, float]]]:
+    """Run YOLO on the uploaded image bytes; cached so widget reruns skip inference.
+
+    Returns (annotated RGB image, all detections, recyclable detections),
+    where detections are [(class name, confidence), ...].
+    """
+    img = decode_upload(image_bytes)
+    model = load_model()
+    # ultralytics letterboxes PIL input itself; shrinking first keeps its
+    # resize cheap and avoids copying the full-resolution photo to numpy
+    img.thumbnail((640, 640), Image.BILINEAR)
+    results = model(img, imgsz=DETECT_IMGSZ, conf=DETECT_CONF)
 
     # results is a Results object list; take first
     r = results[0]
-    annotated = r.plot()
+    # plot() draws on ultralytics' BGR copy of the PIL input
+    annotated = r.plot()[..., ::-1]
 
     # Extract detected class names and confidences
     detected = []
+    recyclable_found = []
     if hasattr(r, "boxes") and r.boxes is not None and len(r.boxes) > 0:
-        for box in r.boxes:
-            # cls_idx = int(box.cls.cpu().numpy()) if hasattr(box, "cls") else None
-            cls_idx = int(box.cls.cpu().numpy()[0]) if hasattr(box, "cls") else None
-            conf = float(box.conf.cpu().numpy()[0]) if hasattr(box, "conf") else None
-            name = r.names[cls_idx] if cls_idx is not None else ""
-            detected.append((name, conf))
+        # One device->host copy per tensor instead of two per box
+        cls = r.boxes.cls.cpu().numpy().astype(np.int32)
+        conf = r.boxes.conf.cpu().numpy()
+        names = [r.names[c] for c in cls.tolist()]
+        detected = list(zip(names, conf.tolist()))
+
+        # Filter recyclable on class indices rather than names
+        mask = np.isin(cls, get_recyclable_ids())
+        recyclable_found = [detected[i] for i in np.flatnonzero(mask)]
+    return annotated, detected, recyclable_found
+
+
+if uploaded:
+    image_data = uploaded.read()
+    img = decode_upload(image_data)
+    
+    # Display images at half size
+    def _render_responsive_image(image, caption=None):
+        # Accepts a PIL image or an RGB numpy array; JPEG keeps the payload small
+        if caption:
+            st.markdown(f"**{caption}**")
+        st.image(image, width=400, output_format="JPEG")
 
-    # Filter recyclable
-    recyclable_found = [d for d in detected if d[0] in RECYCLABLE_COCO]
+    _render_responsive_image(img, caption="Uploaded image")
+
+    with st.spinner("Running detection..."):
+        annotated, detected, recyclable_found = run_detection(image_data)
 
     st.header("Detection Results")
-    _render_responsive_image(Image.fromarray(annotated), caption="Detections")
+    _render_responsive_image(annotated, caption="Detections")
 
     if detected:
         st.subheader("All detected objects")
-        for name, conf in detected:
-            st.write(f"- {name} — {conf:.2f}")
+        st.markdown("\n".join(f"- {name} — {conf:.2f}" for name, conf in detected))
     else:
         st.write("No objects detected.")
 
     st.subheader("Potential Recyclable Items")
     if recyclable_found:
-        for name, conf in recyclable_found:
-            st.success(f"{name} — {conf:.2f}")
+        st.markdown("\n".join(f"- :green[{name} — {conf:.2f}]" for name, conf in recyclable_found))
 
         # Show local recycling instructions when ZIP code provided
         if zip_code:
@@ -401,10 +533,10 @@ if uploaded:
                     st.markdown(f"🔍 [Search for recycling centers near you]({local_rules['earth911_link']})")
                 
                 # Show recycling instructions for detected items
-                st.markdown("**Instructions for detected items:**")
-                for name, conf in recyclable_found:
-                    instr = local_rules.get(name, local_rules.get("default", "No specific instruction available."))
-                    st.write(f"- **{name}**: {instr}")
+                default_instr = local_rules.get("default", "No specific instruction available.")
+                st.markdown("**Instructions for detected items:**\n\n" + "\n".join(
+                    f"- **{name}**: {local_rules.get(name, default_instr)}" for name, conf in recyclable_found
+                ))
                 
                 # Option to show all rules for this location
                 show_all_key = f"show_all_rules_{zip_code}"
@@ -413,9 +545,9 @@ if uploaded:
                     if local_rules:
                         # Skip special keys when showing all rules
                         skip_keys = {"company", "service_provider", "provider", "earth911_link", "_fetched_at"}
-                        for k, v in local_rules.items():
-                            if k not in skip_keys:
-                                st.write(f"- **{k}**: {v}")
+                        st.markdown("\n".join(
+                            f"- **{k}**: {v}" for k, v in local_rules.items() if k not in skip_keys
+                        ))
                     else:
                         st.write("No rules available.")
                 
@@ -424,9 +556,7 @@ if uploaded:
                     if st.button(f"💾 Cache rules for ZIP {zip_code}", key=f"cache_{zip_code}"):
                         with st.spinner(f"Generating lookup information for {zip_code}..."):
                             fetched_rules = fetch_and_save_recycling_rules(zip_code, rules_map)
-                            if "zips" not in rules_map:
-                                rules_map["zips"] = {}
-                            rules_map["zips"][zip_code] = fetched_rules
+                            rules_map.setdefault("zips", {})[zip_code] = fetched_rules
                             if save_rules(rules_map):
                                 st.success(f"Cached lookup information for {zip_code}!")
                                 st.rerun()
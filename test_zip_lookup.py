@@ -3,62 +3,111 @@
 Test script to verify the tiered ZIP code lookup logic.
 """
 
-import json
+import sys
 from pathlib import Path
-from uszipcode import SearchEngine
+from typing import NamedTuple
+
+import orjson
+
+from zip_index import load_zip_index
+
+
+def intern_rules(rules_map: dict) -> None:
+    """Share structurally equal rule dicts and their repeated strings, in place."""
+    canonical = {}
+    for section in ("zips", "cities", "states"):
+        rule_sets = rules_map.get(section, {})
+        for key, rules in rule_sets.items():
+            rules = {
+                sys.intern(item): sys.intern(instr) if isinstance(instr, str) else instr
+                for item, instr in rules.items()
+            }
+            rule_sets[key] = canonical.setdefault(orjson.dumps(rules, option=orjson.OPT_SORT_KEYS), rules)
+
 
 # Load the rules
 rules_path = Path(__file__).parent / "recycling_rules.json"
-rules_map = json.loads(rules_path.read_text())
+rules_map = orjson.loads(rules_path.read_bytes())
+intern_rules(rules_map)
+# 3-digit keys under "zips" are SCF-region prefixes; keep them apart from real ZIPs
+ZIPS = {key: rules for key, rules in rules_map.get("zips", {}).items() if len(key) != 3}
+PREFIXES = {key: rules for key, rules in rules_map.get("zips", {}).items() if len(key) == 3}
+CITIES = rules_map.get("cities", {})
+STATES = rules_map.get("states", {})
+NATIONAL = rules_map.get("national_default", {})
+
+class Location(NamedTuple):
+    """City, county, and state information for a ZIP code."""
+    zipcode: str
+    city: str
+    county: str
+    state: str
+    state_abbr: str
+    city_key: str  # "City, ST", the key into CITIES
 
-# Initialize uszipcode
-search = SearchEngine()
 
-def zip_to_location(zip_code: str):
+# Prebuilt {zip: (city, county, state, state_abbr)} dump of uszipcode; no SQLite at runtime
+ZIP_INDEX = load_zip_index()
+
+
+def zip_to_location(zip_code: str) -> Location | None:
     """Resolve ZIP code to city, county, and state information."""
-    result = search.by_zipcode(zip_code)
+    entry = ZIP_INDEX.get(zip_code)
+    if entry is None:
+        return None
     
-    if result and result.zipcode:
-        return {
-            "zipcode": result.zipcode,
-            "city": result.major_city or result.post_office_city,
-            "county": result.county,
-            "state": result.state,
-            "state_abbr": result.state_abbr,
-        }
-    return None
-
-def get_recycling_rules(zip_code: str, rules_map: dict):
-    """Get recycling rules using tiered resolution."""
+    city, county, state, state_abbr = entry
+    return Location(zip_code, city, county, state, state_abbr, f"{city}, {state_abbr}")
+
+def _resolve_rules(zip_code: str, location: Location | None):
+    """Walk the rule tiers for one ZIP."""
     # Tier 1: Exact ZIP
-    zips = rules_map.get("zips", {})
-    if zip_code in zips:
-        return zips[zip_code], f"ZIP {zip_code}"
+    rules = ZIPS.get(zip_code)
+    if rules is not None:
+        return rules, f"ZIP {zip_code}"
     
     # Tier 2 & 3: City/State via uszipcode
-    location = zip_to_location(zip_code)
     if location:
         # Try city match
-        city_key = f"{location['city']}, {location['state_abbr']}"
-        cities = rules_map.get("cities", {})
-        if city_key in cities:
-            return cities[city_key], city_key
+        city_key = location.city_key
+        rules = CITIES.get(city_key)
+        if rules is not None:
+            return rules, city_key
         
         # Try state match
-        state_abbr = location["state_abbr"]
-        states = rules_map.get("states", {})
-        if state_abbr in states:
-            return states[state_abbr], f"{state_abbr} (state-level)"
+        state_abbr = location.state_abbr
+        rules = STATES.get(state_abbr)
+        if rules is not None:
+            return rules, f"{state_abbr} (state-level)"
     
     # Tier 4: 3-digit prefix (SCF region)
-    if len(zip_code) >= 3:
-        prefix = zip_code[:3]
-        if prefix in zips:
-            return zips[prefix], f"region {prefix}xx"
+    rules = PREFIXES.get(zip_code[:3])
+    if rules is not None:
+        return rules, f"region {zip_code[:3]}xx"
     
     # Tier 5: National default
-    national = rules_map.get("national_default", {})
-    return national, "national default"
+    return NATIONAL, "national default"
+
+
+# Resolve every known ZIP once up front: {zip: (rules, source)}
+RESOLVED = {
+    zip_code: _resolve_rules(zip_code, Location(zip_code, city, county, state, state_abbr, f"{city}, {state_abbr}"))
+    for zip_code, (city, county, state, state_abbr) in ZIP_INDEX.items()
+}
+for zip_code, rules in ZIPS.items():
+    # Configured ZIPs missing from uszipcode still win at Tier 1
+    RESOLVED.setdefault(zip_code, (rules, f"ZIP {zip_code}"))
+
+
+def get_recycling_rules(zip_code: str):
+    """Get recycling rules using tiered resolution."""
+    resolved = RESOLVED.get(zip_code)
+    if resolved is not None:
+        return resolved
+    rules = PREFIXES.get(zip_code[:3])
+    if rules is not None:
+        return rules, f"region {zip_code[:3]}xx"
+    return NATIONAL, "national default"
 
 # Test cases
 test_cases = [
@@ -77,26 +126,36 @@ print("=" * 80)
 print("Testing Tiered ZIP Code Lookup Logic")
 print("=" * 80)
 
+# Per-case report templates, built once and filled in with str.format
+CASE_TEMPLATE = (
+    "\n🔍 Testing {zip_code}: {description}\n"
+    "   📍 Location: {city}, {state_abbr}\n"
+    "   ✅ Rules source: {source}\n"
+    "   📦 Bottle rule: {bottle}...\n"
+    "   🏢 Company: {company}\n"
+)
+NOT_FOUND_TEMPLATE = (
+    "\n🔍 Testing {zip_code}: {description}\n"
+    "   ❌ Invalid or not found in uszipcode database\n"
+)
+
 for zip_code, description in test_cases:
-    print(f"\n🔍 Testing {zip_code}: {description}")
     location = zip_to_location(zip_code)
-    
-    if location:
-        print(f"   📍 Location: {location['city']}, {location['state_abbr']}")
-    else:
-        print(f"   ❌ Invalid or not found in uszipcode database")
+    if not location:
+        sys.stdout.write(NOT_FOUND_TEMPLATE.format(zip_code=zip_code, description=description))
         continue
     
-    rules, source = get_recycling_rules(zip_code, rules_map)
-    print(f"   ✅ Rules source: {source}")
-    
-    # Show bottle rule as example
-    bottle_rule = rules.get("bottle", "No rule")
-    print(f"   📦 Bottle rule: {bottle_rule[:80]}...")
-    
-    # Show company if available
-    company = rules.get("company", "N/A")
-    print(f"   🏢 Company: {company}")
+    rules, source = get_recycling_rules(zip_code)
+    sys.stdout.write(CASE_TEMPLATE.format(
+        zip_code=zip_code,
+        description=description,
+        city=location.city,
+        state_abbr=location.state_abbr,
+        source=source,
+        # Show bottle rule and company as examples
+        bottle=rules.get("bottle", "No rule")[:80],
+        company=rules.get("company", "N/A"),
+    ))
 
 print("\n" + "=" * 80)
 print("✨ Test completed!")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Prebuilt in-memory ZIP code index.
+
+Dumps the uszipcode database to a pickled dict so lookups are a single
+dict probe instead of a SQLAlchemy query per call. Build it once with:
+
+    python zip_index.py
+"""
+
+import pickle
+from pathlib import Path
+
+ZIP_INDEX_PATH = Path(__file__).parent / "zip_index.pkl"
+
+
+def build_zip_index() -> dict[str, tuple[str, str, str, str]]:
+    """Read every ZIP from uszipcode into {zip: (city, county, state, state_abbr)}."""
+    # Only needed at build time; loading the pickle doesn't touch uszipcode
+    from uszipcode import SearchEngine
+
+    search = SearchEngine()
+    # zipcode_type=None keeps PO Box / unique ZIPs, which by_zipcode() also returns
+    results = search.query(zipcode_type=None, returns=0)
+    return {
+        result.zipcode: (
+            result.major_city or result.post_office_city,
+            result.county,
+            result.state,
+            result.state_abbr,
+        )
+        for result in results
+        if result.zipcode
+    }
+
+
+def save_zip_index(index: dict, path: Path = ZIP_INDEX_PATH) -> None:
+    """Write the ZIP index to disk."""
+    path.write_bytes(pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def load_zip_index(path: Path = ZIP_INDEX_PATH) -> dict[str, tuple[str, str, str, str]]:
+    """Load the ZIP index, building and saving it first if it doesn't exist yet."""
+    if path.exists():
+        return pickle.loads(path.read_bytes())
+    index = build_zip_index()
+    try:
+        save_zip_index(index, path)
+    except OSError:
+        pass
+    return index
+
+
+if __name__ == "__main__":
+    index = build_zip_index()
+    save_zip_index(index)
+    print(f"Wrote {len(index)} ZIP codes to {ZIP_INDEX_PATH}")